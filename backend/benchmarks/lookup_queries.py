@@ -0,0 +1,66 @@
+"""Micro-benchmark of the per-call Python overhead of the hot user lookups
+
+Compares the former `db.query(...)` implementations with the precompiled statements of
+`src.routes.users.controller`. An in-memory SQLite database is used, so the numbers are dominated by
+SQLAlchemy's statement construction, compilation and result handling, not by the database.
+
+Run from `/backend`: `python -m benchmarks.lookup_queries`
+"""
+import timeit
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import Base
+from src.routes.users.controller import get_user_by_mail, check_user_existence_by_id, \
+    check_user_existence_by_email
+from src.routes.users.models import User
+
+CALLS = 5000
+MAIL = "saul.goodman@wexler-mcgill.law"
+
+
+def get_user_by_mail_before(mail, db):
+    return db.query(User).filter(User.email == mail).first()
+
+
+def check_user_existence_by_id_before(user_id, db):
+    return db.query(User).filter(User.id == user_id).count() > 0
+
+
+def check_user_existence_by_email_before(mail, db):
+    return db.query(User).filter(User.email == mail).count() > 0
+
+
+def per_call_us(function) -> float:
+    function()
+    return min(timeit.repeat(function, number=CALLS, repeat=5)) / CALLS * 1e6
+
+
+def main():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.add(User(first_name="Saul", last_name="Goodman", email=MAIL, password="", super_admin=True, disabled=False))
+    db.commit()
+
+    cases = [
+        ("get_user_by_mail",
+         lambda: get_user_by_mail_before(MAIL, db),
+         lambda: get_user_by_mail(mail=MAIL, db=db)),
+        ("check_user_existence_by_id",
+         lambda: check_user_existence_by_id_before(1, db),
+         lambda: check_user_existence_by_id(user_id=1, db=db)),
+        ("check_user_existence_by_email",
+         lambda: check_user_existence_by_email_before(MAIL, db),
+         lambda: check_user_existence_by_email(mail=MAIL, db=db)),
+    ]
+
+    print(f"{'lookup':<32}{'before':>12}{'after':>12}{'speedup':>10}")
+    for name, before, after in cases:
+        before_us, after_us = per_call_us(before), per_call_us(after)
+        print(f"{name:<32}{before_us:>9.1f} us{after_us:>9.1f} us{before_us / after_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Goodput under 2x overload, with and without admission control
+
+A simulated endpoint can serve `CAPACITY` requests at a time, each taking `SERVICE_TIME` seconds (think of a DB
+connection pool). Clients send requests at twice the sustainable rate and give up after `CLIENT_TIMEOUT` seconds,
+while the server keeps working on abandoned requests, as a real worker would.
+Goodput is the number of successful responses per second that reached the client in time.
+
+Run from `/backend`: `python -m benchmarks.overload`
+"""
+import asyncio
+import random
+
+from src.util.admission import AdmissionControlMiddleware
+
+CAPACITY = 10
+SERVICE_TIME = 0.05
+OVERLOAD = 2
+DURATION = 10
+CLIENT_TIMEOUT = 1.0
+
+
+def make_endpoint():
+    backend = asyncio.Semaphore(CAPACITY)
+
+    async def endpoint(scope, receive, send):
+        async with backend:
+            await asyncio.sleep(SERVICE_TIME)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return endpoint
+
+
+async def request(app, results):
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app({"type": "http", "method": "GET", "path": "/users/", "headers": []}, receive, send)
+    results.append((status, loop.time() - start))
+
+
+async def run(app):
+    rate = OVERLOAD * CAPACITY / SERVICE_TIME
+    results = []
+    tasks = []
+    loop = asyncio.get_running_loop()
+    end = loop.time() + DURATION
+    arrival = loop.time()
+    random.seed(0)
+
+    # Arrivals are scheduled on absolute times, so sleep overshoots do not lower the offered load
+    while arrival < end:
+        await asyncio.sleep(max(arrival - loop.time(), 0))
+        tasks.append(asyncio.create_task(request(app, results)))
+        arrival += random.expovariate(rate)
+
+    # Requests still queued after the run can no longer reach their clients in time
+    await asyncio.wait(tasks, timeout=CLIENT_TIMEOUT)
+    for task in tasks:
+        task.cancel()
+
+    good = sum(1 for status, latency in results if status == 200 and latency <= CLIENT_TIMEOUT)
+    rejected = sum(1 for status, _ in results if status == 503)
+    return len(tasks), good / DURATION, rejected
+
+
+def main():
+    admission = {
+        "limits": {"auth": CAPACITY, "read": CAPACITY, "write": CAPACITY},
+        "max_queue_wait": SERVICE_TIME * 4,
+    }
+    print(f"capacity {CAPACITY / SERVICE_TIME:.0f} req/s, offered {OVERLOAD * CAPACITY / SERVICE_TIME:.0f} req/s, "
+          f"client timeout {CLIENT_TIMEOUT} s")
+    print(f"{'':<28}{'sent':>8}{'goodput':>14}{'rejected':>10}")
+    for name, app in (("without admission control", make_endpoint()),
+                      ("with admission control", AdmissionControlMiddleware(make_endpoint(), **admission))):
+        sent, goodput, rejected = asyncio.run(run(app))
+        print(f"{name:<28}{sent:>8}{goodput:>10.1f} r/s{rejected:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,57 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import RedirectResponse
+from fastapi.openapi.docs import get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html, get_redoc_html
+from sqlalchemy.exc import OperationalError
+from starlette.responses import RedirectResponse, JSONResponse
 
 from src.config.database import engine
 from src.config.config import APP_NAME, VERSION
+from src.util.profiling import ProfilingMiddleware
+from src.util.slow_queries import install_slow_query_log
+from src.util.activity import flush_activity_safely, flush_activity_periodically
+from src.util.compression import CompressionMiddleware
+from src.util.admission import AdmissionControlMiddleware
+from src.util.deadline import install_statement_timeouts, is_statement_timeout, deadline_exceeded
+from src.util.openapi_cache import get_cached_openapi_response
 
 
-from src.routes import auth, users
+from src.routes import admin, auth, users
 
 from src.routes.users import main, models
 from src.routes.auth import main, models
+from src.routes.admin import main
 
 users.models.Base.metadata.create_all(bind=engine)
 auth.models.Base.metadata.create_all(bind=engine)
+# Registered first, so statements refused because of a passed deadline are not timed
+install_statement_timeouts(engine)
+install_slow_query_log(engine)
 # ----------------------------------------
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Write the buffered last-login/last-seen timestamps in the background and once more on shutdown
+    flush_task = asyncio.create_task(flush_activity_periodically())
+    yield
+    flush_task.cancel()
+    # A periodic flush still running would put failed entries back after the final flush took its snapshot
+    with suppress(asyncio.CancelledError):
+        await flush_task
+    flush_activity_safely()
+
+
 app = FastAPI(
     title=APP_NAME,
-    version=VERSION
+    version=VERSION,
+    lifespan=lifespan,
+    # Served by the routes below, which cache the OpenAPI document
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None
 )
 
 app.add_middleware(
@@ -28,20 +62,63 @@ app.add_middleware(
     allow_credentials=True
 )
 
+app.add_middleware(CompressionMiddleware)
+
+# Caps in-flight requests per route class and sets the request deadline
+app.add_middleware(AdmissionControlMiddleware)
+
+# Outermost middleware, so a profiled request covers the whole stack
+app.add_middleware(ProfilingMiddleware)
+
 # ---- Do this for all of your routes ----
 app.include_router(users.main.router)
 app.include_router(auth.main.router)
+app.include_router(admin.main.router)
 # ----------------------------------------
 
 
+# Statements aborted by MariaDB because the request ran out of time are answered like other passed deadlines
+@app.exception_handler(OperationalError)
+async def handle_operational_error(request: Request, exc: OperationalError):
+    if not is_statement_timeout(exc):
+        raise exc
+
+    deadline = deadline_exceeded()
+    return JSONResponse(status_code=deadline.status_code, content={"detail": deadline.detail}, headers=deadline.headers)
+
+
 # Redirect / -> Swagger-UI documentation
 @app.get("/")
 def main_function():
     """
     # Redirect
-    to documentation (`/docs/`).
+    to documentation (`/docs`).
     """
-    return RedirectResponse(url="/docs/")
+    return RedirectResponse(url="/docs")
+
+
+@app.get("/openapi.json", include_in_schema=False)
+def get_openapi_document(request: Request):
+    return get_cached_openapi_response(app, request)
+
+
+# Like FastAPI's own documentation routes, the URLs respect the root path of a proxy
+@app.get("/docs", include_in_schema=False)
+def get_swagger_documentation(request: Request):
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    return get_swagger_ui_html(openapi_url=root_path + "/openapi.json", title=f"{APP_NAME} - Swagger UI",
+                               oauth2_redirect_url=root_path + "/docs/oauth2-redirect")
+
+
+@app.get("/docs/oauth2-redirect", include_in_schema=False)
+def swagger_oauth2_redirect():
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@app.get("/redoc", include_in_schema=False)
+def get_redoc_documentation(request: Request):
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    return get_redoc_html(openapi_url=root_path + "/openapi.json", title=f"{APP_NAME} - ReDoc")
 
 
 # Swagger expects the auth-URL to be /token, but in our case it is /auth/token
@@ -2,4 +2,30 @@
 
 APP_NAME = "My fancy app"
 FRONTEND_URL = "http://localhost:8080/"
-VERSION = "v1.0.0"
\ No newline at end of file
+VERSION = "v1.0.0"
+
+# TODO: Set a secret to enable on-demand profiling (requests sending it in the PROFILING_HEADER get profiled)
+PROFILING_SECRET = ""
+PROFILING_HEADER = "X-Profile"
+PROFILE_DIR = "profiles"
+PROFILE_MAX_FILES = 20
+
+# Statements slower than this are aggregated in the slow-query log (see /admin/slow-queries)
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_MAX_SHAPES = 500
+SLOW_QUERY_EXPLAIN_TOP = 5
+
+# Last-login and last-seen timestamps are buffered in memory and written in batches
+ACTIVITY_FLUSH_INTERVAL_SECONDS = 30
+ACTIVITY_BUFFER_MAX_USERS = 10000
+
+# Responses of these types and at least this size get compressed (gzip, or brotli if installed)
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+# Admission control: maximum in-flight requests per route class and how long a request may wait for a slot
+ADMISSION_LIMITS = {"auth": 8, "read": 64, "write": 16}
+ADMISSION_MAX_QUEUE_WAIT_SECONDS = 0.5
+ADMISSION_RETRY_AFTER_SECONDS = 1
+# Deadline of a request, propagated into DB statements and mail sending
+REQUEST_TIMEOUT_SECONDS = 10
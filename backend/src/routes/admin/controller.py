@@ -0,0 +1,29 @@
+"""Logic for administrative insights into the running app"""
+from fastapi import HTTPException
+
+from src.util.profiling import list_profiles, get_profile_path
+from src.util.slow_queries import get_slow_query_report, reset_slow_query_log
+
+
+def get_profiles():
+    return list_profiles()
+
+
+def get_profile(name: str):
+    path = get_profile_path(name)
+
+    if not path:
+        raise HTTPException(
+            status_code=404,
+            detail=f"There is no profile with the name \"{name}\"."
+        )
+
+    return path
+
+
+def get_slow_queries(explain: bool):
+    return get_slow_query_report(explain=explain)
+
+
+def clear_slow_queries():
+    reset_slow_query_log()
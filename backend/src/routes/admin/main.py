@@ -0,0 +1,66 @@
+"""Administrative insights into the running app"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from src.routes.auth.controller import get_current_admin_user
+from src.routes.users.schemas import User
+from .controller import get_profiles, get_profile, get_slow_queries, clear_slow_queries
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/profiles")
+async def get_all_profiles(admin: User = Depends(get_current_admin_user)):
+    """
+    # Get a list of all stored request profiles
+
+    Requests sending the configured profiling secret in the `X-Profile` header get profiled.
+    The name of their profile is returned in the `X-Profile-Id` response header. Newest profiles come first.
+
+    **Access:** Admins.
+    """
+    return get_profiles()
+
+
+@router.get("/profiles/{name}")
+async def get_single_profile(name: str, admin: User = Depends(get_current_admin_user)):
+    """
+    # Get a stored request profile
+
+    Plain text report with wall time, DB time, bcrypt time and the call tree of the request.
+
+    **Access:** Admins.
+    """
+    return FileResponse(get_profile(name=name), media_type="text/plain")
+
+
+@router.get("/slow-queries")
+async def get_slow_query_log(explain: bool = False, admin: User = Depends(get_current_admin_user)):
+    """
+    # Get the slow-query log
+
+    All statements slower than the configured threshold, aggregated by their shape (values replaced by `?`)
+    with count, total, max and average time in ms, sorted by total time.
+
+    With `explain=true`, the `EXPLAIN` output of the slowest SELECT-shapes is included.
+
+    **Access:** Admins.
+    """
+    return await run_in_threadpool(get_slow_queries, explain)
+
+
+@router.delete("/slow-queries")
+async def delete_slow_query_log(admin: User = Depends(get_current_admin_user)):
+    """
+    # Reset the slow-query log
+
+    **Access:** Admins.
+    """
+    clear_slow_queries()
+    return JSONResponse(status_code=200, content={"detail": "Slow-query log successfully reset."})
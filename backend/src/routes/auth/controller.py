@@ -17,6 +17,7 @@ from src.routes.users.schemas import User
 from src.routes.users.models import User as UserModel
 from .models import PasswordResetToken
 from src.util.mail.mail_sender import send_password_reset_mail
+from src.util.activity import record_seen
 from src.routes.users.controller import check_user_existence_by_id
 from pydantic import EmailStr
 
@@ -118,6 +119,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     user = get_user_by_mail(mail=token_data.username, db=db)
     if user is None:
         raise credentials_exception
+    record_seen(user_id=user.id)
     return user
 
 
@@ -133,6 +135,18 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+    """ Outputs the user information based on the JWT, if the user is an enabled admin
+
+    :param current_user: Authentication-Token
+    :raise HTTPException: 403 if user is no admin
+    :return Object of type `User`
+    """
+    if not current_user.super_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin rights required")
+    return current_user
+
+
 def is_user_disabled(user_email, db: Session):
     """ Check if a user is disabled by using the email/username
 
@@ -12,6 +12,7 @@ from .controller import authenticate_user, ACCESS_TOKEN_EXPIRE_MINUTES, create_a
 from .schemas import Token, EmailSchema, SetNewPassword
 from src.util.db_dependency import get_db
 from src.routes.users.controller import check_user_existence_by_email
+from src.util.activity import record_login
 
 router = APIRouter(
     prefix="/auth",
@@ -44,6 +45,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         )
 
     user = authenticate_user(username=form_data.username, password=form_data.password, db=db)
+    record_login(user_id=user.id)
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -2,11 +2,23 @@ from fastapi import HTTPException
 from pydantic import EmailStr
 
 from .models import User
+from sqlalchemy import bindparam, exists, select
 from sqlalchemy.orm import Session
 
+BATCH_MAX_IDS = 100
+"""Maximum number of ids that can be resolved with one batch request"""
+BULK_CHUNK_SIZE = 500
+"""Number of ids handled by one statement of a bulk operation"""
+
+# Hot lookups are built once. Executing them only binds new values and hits SQLAlchemy's compiled cache.
+_user_by_mail = select(User).where(User.email == bindparam("mail")).limit(1)
+_user_exists_by_id = select(exists().where(User.id == bindparam("user_id")))
+_user_exists_by_email = select(exists().where(User.email == bindparam("mail")))
+
 
 def get_users_admin(db: Session):
-    users = db.query(User.id, User.first_name, User.last_name, User.email, User.super_admin, User.disabled).all()
+    users = db.query(User.id, User.first_name, User.last_name, User.email, User.super_admin, User.disabled,
+                     User.last_login_at, User.last_seen_at).all()
     return users
 
 
@@ -16,8 +28,8 @@ def get_users(db: Session):
 
 
 def get_user_by_id(user_id: int, db: Session):
-    user = db.query(User.id, User.first_name, User.last_name, User.email, User.super_admin, User.disabled).filter(
-        User.id == user_id).first()
+    user = db.query(User.id, User.first_name, User.last_name, User.email, User.super_admin, User.disabled,
+                    User.last_login_at, User.last_seen_at).filter(User.id == user_id).first()
 
     if not user:
         raise HTTPException(
@@ -28,8 +40,46 @@ def get_user_by_id(user_id: int, db: Session):
     return user
 
 
+def get_users_by_ids(user_ids: list[int], admin: bool, db: Session):
+    """ Resolve several users with a single `IN` query.
+
+    :param user_ids: Ids to resolve, duplicates are ignored
+    :param admin: If `True`, the admin projection is used and disabled users are included,
+        otherwise the projection of `get_users` (without ids)
+    :param db: Database dependency
+    :raise HTTPException: 400 if more than `BATCH_MAX_IDS` distinct ids are requested
+    :return: Dict with the found `users` in the order of `user_ids` and the `missing` ids
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if len(user_ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_IDS} ids can be requested at once."
+        )
+
+    if not user_ids:
+        return {"users": [], "missing": []}
+
+    if admin:
+        query = db.query(User.id, User.first_name, User.last_name, User.email, User.super_admin, User.disabled,
+                         User.last_login_at, User.last_seen_at)
+        found = {user.id: user for user in query.filter(User.id.in_(user_ids)).all()}
+    else:
+        # The id is only selected to map the rows back to the requested ids, it is not returned
+        query = db.query(User.id, User.first_name, User.last_name, User.email, User.disabled).filter(
+            User.disabled == False)
+        found = {user.id: {"first_name": user.first_name, "last_name": user.last_name, "email": user.email,
+                           "disabled": user.disabled}
+                 for user in query.filter(User.id.in_(user_ids)).all()}
+
+    return {
+        "users": [found[user_id] for user_id in user_ids if user_id in found],
+        "missing": [user_id for user_id in user_ids if user_id not in found]
+    }
+
+
 def get_user_by_mail(mail: EmailStr, db: Session):
-    user = db.query(User).filter(User.email == mail).first()
+    user = db.execute(_user_by_mail, {"mail": mail}).scalars().first()
 
     if not user:
         raise HTTPException(
@@ -41,16 +91,59 @@ def get_user_by_mail(mail: EmailStr, db: Session):
 
 
 def check_user_existence_by_id(user_id: int, db: Session):
-    count = db.query(User).filter(User.id == user_id).count()
-    if count < 1:
-        return False
-
-    return True
+    return bool(db.execute(_user_exists_by_id, {"user_id": user_id}).scalar())
 
 
 def check_user_existence_by_email(mail: EmailStr, db: Session):
-    count = db.query(User).filter(User.email == mail).count()
-    if count > 0:
-        return True
-
-    return False
\ No newline at end of file
+    return bool(db.execute(_user_exists_by_email, {"mail": mail}).scalar())
+
+
+def _apply_to_users(user_ids: list[int], operation, db: Session):
+    """ Run a set-based operation on all existing users of `user_ids`, one statement per chunk.
+
+    :param user_ids: Ids of the users, duplicates are ignored
+    :param operation: Called with a query filtered to the existing ids of one chunk
+    :param db: Database dependency
+    :return: Dict with the `affected` and the `missing` ids
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    existing = set()
+
+    for start in range(0, len(user_ids), BULK_CHUNK_SIZE):
+        chunk = user_ids[start:start + BULK_CHUNK_SIZE]
+        # Locks the rows until the commit, so ids deleted concurrently are not reported as affected
+        chunk_existing = [row.id for row in db.query(User.id).filter(User.id.in_(chunk)).with_for_update().all()]
+        if chunk_existing:
+            operation(db.query(User).filter(User.id.in_(chunk_existing)))
+            existing.update(chunk_existing)
+
+    db.commit()
+
+    return {
+        "affected": [user_id for user_id in user_ids if user_id in existing],
+        "missing": [user_id for user_id in user_ids if user_id not in existing]
+    }
+
+
+def set_users_disabled(user_ids: list[int], disabled: bool, db: Session):
+    return _apply_to_users(
+        user_ids=user_ids,
+        operation=lambda query: query.update({User.disabled: disabled}, synchronize_session=False),
+        db=db
+    )
+
+
+def promote_users(user_ids: list[int], db: Session):
+    return _apply_to_users(
+        user_ids=user_ids,
+        operation=lambda query: query.update({User.super_admin: True}, synchronize_session=False),
+        db=db
+    )
+
+
+def delete_users(user_ids: list[int], db: Session):
+    return _apply_to_users(
+        user_ids=user_ids,
+        operation=lambda query: query.delete(synchronize_session=False),
+        db=db
+    )
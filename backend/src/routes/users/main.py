@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 
-from src.routes.auth.controller import get_current_active_user
+from src.routes.auth.controller import get_current_active_user, get_current_admin_user
 from src.util.db_dependency import get_db
 from .controller import *
 from .schemas import *
@@ -32,6 +32,84 @@ async def get_all_users(user: User = Depends(get_current_active_user),
         return get_users(db=db)
 
 
+@router.get("/batch")
+async def get_user_batch(ids: list[int] = Query(...),
+                         user: User = Depends(get_current_active_user),
+                         db: Session = Depends(get_db)):
+    """
+    # Get several users by id
+
+    Resolves the ids with a single query, e.g. `/users/batch?ids=1&ids=2`.
+    Requests with more than `BATCH_MAX_IDS` distinct ids are rejected with 400.
+    Returns the found `users` in the requested order and the ids that could not be resolved as `missing`.
+
+    **Access:**
+    - Admins can resolve every user.
+    - Users with lower rights can only resolve enabled users, disabled ones are reported as missing.
+    """
+    return get_users_by_ids(user_ids=ids, admin=user.super_admin, db=db)
+
+
+# ---------------------------
+# ----- Bulk-Operations -----
+# ---------------------------
+@router.post("/bulk/disable")
+async def disable_users(user_ids: UserIds,
+                        admin: User = Depends(get_current_admin_user),
+                        db: Session = Depends(get_db)):
+    """
+    # Disable several users
+
+    Returns the `affected` ids and the ids that do not belong to any user as `missing`.
+
+    **Access:** Admins.
+    """
+    return set_users_disabled(user_ids=user_ids.ids, disabled=True, db=db)
+
+
+@router.post("/bulk/enable")
+async def enable_users(user_ids: UserIds,
+                       admin: User = Depends(get_current_admin_user),
+                       db: Session = Depends(get_db)):
+    """
+    # Enable several users
+
+    Returns the `affected` ids and the ids that do not belong to any user as `missing`.
+
+    **Access:** Admins.
+    """
+    return set_users_disabled(user_ids=user_ids.ids, disabled=False, db=db)
+
+
+@router.post("/bulk/promote")
+async def promote_users_to_admin(user_ids: UserIds,
+                                 admin: User = Depends(get_current_admin_user),
+                                 db: Session = Depends(get_db)):
+    """
+    # Give several users admin rights
+
+    Returns the `affected` ids and the ids that do not belong to any user as `missing`.
+
+    **Access:** Admins.
+    """
+    return promote_users(user_ids=user_ids.ids, db=db)
+
+
+@router.post("/bulk/delete")
+async def delete_several_users(user_ids: UserIds,
+                               admin: User = Depends(get_current_admin_user),
+                               db: Session = Depends(get_db)):
+    """
+    # Delete several users
+
+    Pending password reset tokens of the users are deleted as well.
+    Returns the `affected` ids and the ids that do not belong to any user as `missing`.
+
+    **Access:** Admins.
+    """
+    return delete_users(user_ids=user_ids.ids, db=db)
+
+
 def get_user_by_id(user_id: int, db: Session):
     user = db.query(User.id, User.first_name, User.last_name, User.email, User.super_admin, User.disabled).filter(
         User.id == user_id).first()
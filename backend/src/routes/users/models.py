@@ -1,5 +1,5 @@
 from src.config.database import Base
-from sqlalchemy import Column, String, Integer, Boolean
+from sqlalchemy import Column, String, Integer, Boolean, DateTime
 
 
 class User(Base):
@@ -12,3 +12,5 @@ class User(Base):
     password = Column(String(length=250))
     super_admin = Column(Boolean, default=False)
     disabled = Column(Boolean, default=False)
+    last_login_at = Column(DateTime, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)
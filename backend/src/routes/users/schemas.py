@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -9,6 +11,12 @@ class User(BaseModel):
     password: str
     super_admin: bool
     disabled: bool | None = None
+    last_login_at: datetime | None = None
+    last_seen_at: datetime | None = None
 
     class Config:
         orm_mode = True
+
+
+class UserIds(BaseModel):
+    ids: list[int]
@@ -0,0 +1,164 @@
+"""Write-behind buffer for the last-login and last-seen timestamps of users"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from src.config.config import ACTIVITY_FLUSH_INTERVAL_SECONDS, ACTIVITY_BUFFER_MAX_USERS
+from src.config.database import SessionLocal
+from src.routes.users.controller import BULK_CHUNK_SIZE
+from src.routes.users.models import User
+
+logger = logging.getLogger(__name__)
+
+_users = User.__table__
+
+_lock = threading.Lock()
+_pending: dict[int, dict] = {}
+_flush_requested: asyncio.Event | None = None
+_flusher_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _take_pending() -> dict[int, dict]:
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    return pending
+
+
+def _request_flush():
+    if _flush_requested is None:
+        return
+    try:
+        _flusher_loop.call_soon_threadsafe(_flush_requested.set)
+    except RuntimeError:
+        # Event loop already closed, the shutdown flush takes care of the buffer
+        pass
+
+
+def _record(user_id: int, login: bool):
+    now = datetime.utcnow()
+    with _lock:
+        entry = _pending.get(user_id)
+        if entry is None and len(_pending) < ACTIVITY_BUFFER_MAX_USERS:
+            entry = _pending[user_id] = {"b_id": user_id, "b_login": None, "b_seen": now}
+
+        # Without an entry the buffer is full. The activity is dropped to keep the bound,
+        # the next request of this user records it again.
+        if entry is not None:
+            entry["b_seen"] = now
+            if login:
+                entry["b_login"] = now
+        full = len(_pending) >= ACTIVITY_BUFFER_MAX_USERS
+
+    if full:
+        _request_flush()
+
+
+def record_login(user_id: int):
+    """ Remember a successful login. Also counts as activity.
+
+    Never touches the database. Once the buffer holds `ACTIVITY_BUFFER_MAX_USERS` users, the background flusher is
+    woken up and activity of further users is dropped until it wrote the buffer.
+
+    :param user_id: Id of the user
+    """
+    _record(user_id, True)
+
+
+def record_seen(user_id: int):
+    """ Remember an authenticated request of a user.
+
+    Never touches the database. Once the buffer holds `ACTIVITY_BUFFER_MAX_USERS` users, the background flusher is
+    woken up and activity of further users is dropped until it wrote the buffer.
+
+    :param user_id: Id of the user
+    """
+    _record(user_id, False)
+
+
+def _update_activity(entries: list[dict]):
+    """ Set-based UPDATE of the timestamps of all `entries`: `... WHERE id IN (...)` with a `CASE id` per column.
+
+    Timestamps only move forward, so a worker flushing older activity later does not overwrite newer one.
+    """
+    seen = case({entry["b_id"]: entry["b_seen"] for entry in entries}, value=_users.c.id)
+    values = {"last_seen_at": func.greatest(func.coalesce(_users.c.last_seen_at, seen), seen)}
+
+    logins = {entry["b_id"]: entry["b_login"] for entry in entries if entry["b_login"] is not None}
+    if logins:
+        # Users without a login in `entries` get NULL from the CASE, which keeps their stored value
+        login = case(logins, value=_users.c.id)
+        values["last_login_at"] = func.coalesce(
+            func.greatest(func.coalesce(_users.c.last_login_at, login), login),
+            _users.c.last_login_at
+        )
+
+    return update(_users).where(_users.c.id.in_([entry["b_id"] for entry in entries])).values(values)
+
+
+def flush_activity(db: Session | None = None):
+    """ Write all buffered timestamps with one set-based UPDATE per `BULK_CHUNK_SIZE` users, in one transaction.
+
+    If writing fails, the timestamps are put back into the buffer as far as it has room, unless newer ones have been
+    recorded meanwhile.
+
+    :param db: Database session, defaults to a new session
+    """
+    pending = _take_pending()
+    if not pending:
+        return
+
+    session = None
+    try:
+        session = db or SessionLocal()
+        entries = list(pending.values())
+        for start in range(0, len(entries), BULK_CHUNK_SIZE):
+            session.execute(_update_activity(entries[start:start + BULK_CHUNK_SIZE]))
+        session.commit()
+    except Exception:
+        with _lock:
+            for user_id, entry in pending.items():
+                newer = _pending.get(user_id)
+                if newer is None:
+                    if len(_pending) < ACTIVITY_BUFFER_MAX_USERS:
+                        _pending[user_id] = entry
+                elif newer["b_login"] is None:
+                    newer["b_login"] = entry["b_login"]
+        if session is not None:
+            session.rollback()
+        raise
+    finally:
+        if db is None and session is not None:
+            session.close()
+
+
+def flush_activity_safely():
+    """ Like `flush_activity`, but failures are logged instead of raised. Used on shutdown. """
+    try:
+        flush_activity()
+    except Exception:
+        logger.exception("Could not write the activity of users.")
+
+
+async def flush_activity_periodically():
+    """ Flush the buffer every `ACTIVITY_FLUSH_INTERVAL_SECONDS`, or earlier once it is full, until cancelled. """
+    global _flush_requested, _flusher_loop
+    _flusher_loop = asyncio.get_running_loop()
+    _flush_requested = asyncio.Event()
+
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(_flush_requested.wait(), timeout=ACTIVITY_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _flush_requested.clear()
+            await run_in_threadpool(flush_activity_safely)
+    finally:
+        _flush_requested = None
+        _flusher_loop = None
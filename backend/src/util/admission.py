@@ -0,0 +1,79 @@
+"""Admission control: bounded concurrency per route class and early rejection under overload"""
+import asyncio
+import json
+import time
+
+from src.config.config import ADMISSION_LIMITS, ADMISSION_MAX_QUEUE_WAIT_SECONDS, ADMISSION_RETRY_AFTER_SECONDS, \
+    REQUEST_TIMEOUT_SECONDS
+from .deadline import set_deadline, reset_deadline
+
+_OVERLOADED_BODY = json.dumps({"detail": "The server is overloaded, please retry later."}).encode("utf-8")
+
+
+def get_route_class(scope) -> str:
+    """ Route class of a request, each class has its own limit in `ADMISSION_LIMITS`.
+
+    :param scope: ASGI scope of the request
+    :return: `"auth"` for logins and password resets, `"read"` for other GET/HEAD requests, else `"write"`
+    """
+    path = scope["path"]
+    if path == "/token" or path.startswith("/auth/"):
+        return "auth"
+    if scope["method"] in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+class AdmissionControlMiddleware:
+    """ Caps the in-flight requests per route class.
+
+    Requests beyond the cap wait for a free slot for at most `max_queue_wait` seconds and are rejected with 503 and
+    `Retry-After` afterwards, instead of queueing until they time out anyway.
+    Every admitted request gets a deadline of `request_timeout` seconds after its arrival,
+    which is propagated into DB statements and mail sending (see `src.util.deadline`).
+    """
+
+    def __init__(self, app, limits: dict[str, int] | None = None, max_queue_wait: float | None = None,
+                 request_timeout: float | None = None):
+        self.app = app
+        self.limits = limits or ADMISSION_LIMITS
+        self.max_queue_wait = ADMISSION_MAX_QUEUE_WAIT_SECONDS if max_queue_wait is None else max_queue_wait
+        self.request_timeout = REQUEST_TIMEOUT_SECONDS if request_timeout is None else request_timeout
+        self.slots = {route_class: asyncio.Semaphore(limit) for route_class, limit in self.limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        arrival = time.monotonic()
+        slots = self.slots[get_route_class(scope)]
+
+        if slots.locked():
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout=self.max_queue_wait)
+            except asyncio.TimeoutError:
+                await self._reject(send)
+                return
+        else:
+            await slots.acquire()
+
+        token = set_deadline(arrival + self.request_timeout)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
+            slots.release()
+
+    @staticmethod
+    async def _reject(send):
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_OVERLOADED_BODY)).encode("latin-1")),
+                (b"retry-after", str(ADMISSION_RETRY_AFTER_SECONDS).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _OVERLOADED_BODY})
@@ -0,0 +1,99 @@
+"""Response compression with gzip and, if the `brotli` package is installed, brotli"""
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from src.config.config import COMPRESSION_MIN_SIZE, COMPRESSION_CONTENT_TYPES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """ Pick the best supported encoding the client accepts.
+
+    :param accept_encoding: Value of the `Accept-Encoding` request header
+    :return: `"br"`, `"gzip"` or `None` if the response should not be compressed
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int | None = None) -> bytes:
+    """ Compress `body` with `encoding` as returned by `choose_encoding`.
+
+    :param body: Uncompressed content
+    :param encoding: `"br"` or `"gzip"`
+    :param level: Compression level, by default a fast one suited for responses generated per request
+    :return: Compressed content
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=5 if level is None else level)
+    return gzip.compress(body, compresslevel=6 if level is None else level)
+
+
+class CompressionMiddleware:
+    """ Compresses complete (non-streaming) responses of an allowed content type of at least `COMPRESSION_MIN_SIZE`.
+
+    Responses that are already encoded, e.g. the pre-compressed OpenAPI document, are passed through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                if "content-encoding" in headers or content_type not in COMPRESSION_CONTENT_TYPES:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start_message)
+            headers.add_vary_header("Accept-Encoding")
+            passthrough = True
+
+            if message.get("more_body", False) or len(body) < COMPRESSION_MIN_SIZE:
+                # Streaming responses are sent as they are, to not buffer them completely
+                await send(start_message)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            if headers.get("etag", "").startswith('"'):
+                headers["ETag"] = "W/" + headers["etag"]
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
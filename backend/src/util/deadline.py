@@ -0,0 +1,119 @@
+"""Per-request deadline, propagated into DB statements and outgoing mails"""
+import asyncio
+import re
+import time
+from contextvars import ContextVar
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config.config import ADMISSION_RETRY_AFTER_SECONDS
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+MARIADB_STATEMENT_TIMEOUT = 1969
+"""Error code of MariaDB, if a statement was aborted because of `max_statement_time`"""
+
+_TIMEOUT_PREFIX = re.compile(r"^SET STATEMENT max_statement_time=[\d.]+ FOR ")
+_LIMITABLE_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+def set_deadline(deadline: float):
+    """ Set the deadline of the current request.
+
+    :param deadline: Point in time as returned by `time.monotonic()`
+    :return: Token to restore the previous deadline with `reset_deadline`
+    """
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """ Time left until the deadline of the current request.
+
+    :return: Seconds (negative if the deadline passed) or `None` outside a request
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_exceeded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="The request could not be completed in time.",
+        headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+    )
+
+
+async def with_deadline(awaitable):
+    """ Await `awaitable`, but not longer than the deadline of the current request allows.
+
+    :param awaitable: E.g. a coroutine sending a mail
+    :raise HTTPException: 503 if the deadline passes
+    :return: Result of `awaitable`
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout=max(remaining, 0))
+    except asyncio.TimeoutError:
+        raise deadline_exceeded()
+
+
+def is_statement_timeout(exception: Exception) -> bool:
+    """ Check if a DB error was caused by the timeout set by `install_statement_timeouts`.
+
+    :param exception: E.g. a `sqlalchemy.exc.OperationalError`
+    :return: `True` if MariaDB aborted the statement because of `max_statement_time`
+    """
+    args = getattr(getattr(exception, "orig", None), "args", None)
+    return bool(args) and args[0] == MARIADB_STATEMENT_TIMEOUT
+
+
+def strip_statement_timeout(statement: str) -> str:
+    """ Remove the timeout added by `install_statement_timeouts` from a statement. """
+    return _TIMEOUT_PREFIX.sub("", statement)
+
+
+def _limit_statement(conn, cursor, statement, parameters, context, executemany):
+    remaining = remaining_time()
+    if remaining is None:
+        return statement, parameters
+
+    if remaining <= 0:
+        raise deadline_exceeded()
+
+    # executemany is left alone, as the prefix would keep PyMySQL from batching INSERTs
+    if executemany or not statement.lstrip()[:6].upper().startswith(_LIMITABLE_STATEMENTS):
+        return statement, parameters
+
+    # MariaDB aborts the statement once the request is out of time, without an extra round trip.
+    # A max_statement_time of 0 would disable the limit, so at least one millisecond is set.
+    return f"SET STATEMENT max_statement_time={max(remaining, 0.001):.3f} FOR {statement}", parameters
+
+
+def _check_deadline(conn, cursor, statement, parameters, context, executemany):
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise deadline_exceeded()
+
+
+def install_statement_timeouts(engine: Engine):
+    """ Limit every statement executed during a request to the time left until its deadline.
+
+    Statements are refused once the deadline passed. The server-side timeout is only set for MariaDB.
+
+    :param engine: Engine to instrument
+    """
+    if getattr(engine.dialect, "is_mariadb", False):
+        event.listen(engine, "before_cursor_execute", _limit_statement, retval=True)
+    else:
+        event.listen(engine, "before_cursor_execute", _check_deadline)
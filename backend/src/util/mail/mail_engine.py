@@ -1,6 +1,7 @@
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 from pydantic import EmailStr
 from src.config.config import FRONTEND_URL
+from src.util.deadline import with_deadline
 
 # TODO: Configure your mailserver
 conf = ConnectionConfig(
@@ -120,7 +121,7 @@ async def send_mail(mail: EmailStr, subj: str, content: str):
     )
 
     fm = FastMail(conf)
-    await fm.send_message(message)
+    await with_deadline(fm.send_message(message))
 
 
 def tr(content: str):
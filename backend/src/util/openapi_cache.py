@@ -0,0 +1,64 @@
+"""OpenAPI document generated once and served pre-compressed"""
+import hashlib
+import json
+
+from fastapi import FastAPI, Request, Response
+
+from .compression import brotli, choose_encoding, compress
+
+
+def _build_document(app: FastAPI, root_path: str):
+    schema = app.openapi()
+    servers = schema.get("servers", [])
+    if root_path and app.root_path_in_servers and root_path not in [server.get("url") for server in servers]:
+        # Same as FastAPI's own route: behind a proxy, the root path is announced as first server
+        schema = {**schema, "servers": [{"url": root_path}] + servers}
+
+    body = json.dumps(schema, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:32]
+
+    # Every representation gets its own strong ETag
+    variants = {None: (body, f'"{digest}"'), "gzip": (compress(body, "gzip", level=9), f'"{digest}-gzip"')}
+    if brotli is not None:
+        variants["br"] = (compress(body, "br", level=11), f'"{digest}-br"')
+
+    return variants
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+
+    return False
+
+
+def get_cached_openapi_response(app: FastAPI, request: Request) -> Response:
+    """ Serve the OpenAPI document of `app` from memory.
+
+    The document and its compressed variants are built on the first call per root path. Clients can revalidate with
+    `If-None-Match` against the ETag of the variant, which is answered with 304.
+
+    :param app: App to document, all routes have to be included already
+    :param request: Request for the document
+    :return: Response with the variant matching the `Accept-Encoding` of the request
+    """
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    documents = getattr(app.state, "openapi_documents", None)
+    if documents is None:
+        documents = app.state.openapi_documents = {}
+    if root_path not in documents:
+        documents[root_path] = _build_document(app, root_path)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    body, etag = documents[root_path][encoding]
+
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if _matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,151 @@
+"""On-demand profiling of single requests"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+import uuid
+
+from starlette.concurrency import run_in_threadpool
+
+from src.config.config import PROFILING_SECRET, PROFILING_HEADER, PROFILE_DIR, PROFILE_MAX_FILES
+
+PROFILE_NAME_PATTERN = re.compile(r"^\d+-[0-9a-f]{8}\.txt$")
+"""Pattern of the file names written to `PROFILE_DIR`"""
+
+logger = logging.getLogger(__name__)
+
+_DB_FUNCTIONS = {"do_execute", "do_executemany", "do_execute_no_params"}
+_profiler_lock = threading.Lock()
+
+
+def _is_triggered(scope) -> bool:
+    if not PROFILING_SECRET:
+        return False
+
+    header = PROFILING_HEADER.lower().encode("latin-1")
+    for name, value in scope["headers"]:
+        if name == header:
+            return secrets.compare_digest(value, PROFILING_SECRET.encode("latin-1"))
+
+    return False
+
+
+def _time_spent_in(stats: pstats.Stats, matches) -> float:
+    """ Sum up the cumulative time of all profiled functions accepted by `matches`.
+
+    :param stats: Profile of the request
+    :param matches: Called with `(filename, function_name)` of every profiled function
+    :return: Time in seconds
+    """
+    return sum(
+        cumulative_time
+        for (filename, _, function_name), (_, _, _, cumulative_time, _) in stats.stats.items()
+        if matches(filename, function_name)
+    )
+
+
+def _is_db_call(filename: str, function_name: str) -> bool:
+    return function_name in _DB_FUNCTIONS and filename.replace("\\", "/").endswith("sqlalchemy/engine/default.py")
+
+
+def _is_bcrypt_call(filename: str, function_name: str) -> bool:
+    return "bcrypt" in (filename + function_name) and ("hashpw" in function_name or "checkpw" in function_name)
+
+
+def _write_profile(name: str, scope, status: int | None, wall_time: float, profiler: cProfile.Profile):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+
+    stream.write(f"{scope['method']} {scope['path']} -> {status}\n")
+    stream.write(f"Wall time:   {wall_time * 1000:.2f} ms\n")
+    stream.write(f"DB time:     {_time_spent_in(stats, _is_db_call) * 1000:.2f} ms\n")
+    stream.write(f"bcrypt time: {_time_spent_in(stats, _is_bcrypt_call) * 1000:.2f} ms\n\n")
+
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    stats.print_stats(50)
+    stats.print_callees(30)
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, name), "w") as file:
+        file.write(stream.getvalue())
+
+    for old_name in list_profiles()[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, old_name))
+        except FileNotFoundError:
+            # Already pruned by a concurrent write
+            pass
+
+
+def list_profiles() -> list[str]:
+    """ Names of the stored profiles, newest first.
+
+    :return: List of file names inside `PROFILE_DIR`
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    return sorted((name for name in os.listdir(PROFILE_DIR) if PROFILE_NAME_PATTERN.match(name)), reverse=True)
+
+
+def get_profile_path(name: str) -> str | None:
+    """ Path of a stored profile.
+
+    :param name: File name as returned by `list_profiles`
+    :return: Path of the file or `None` if there is no profile with this name
+    """
+    if not PROFILE_NAME_PATTERN.match(name) or not os.path.isfile(os.path.join(PROFILE_DIR, name)):
+        return None
+
+    return os.path.join(PROFILE_DIR, name)
+
+
+class ProfilingMiddleware:
+    """ Profiles a request with cProfile, if it sends `PROFILING_SECRET` in the `PROFILING_HEADER`.
+
+    The report (call tree, DB time, bcrypt time) is written to `PROFILE_DIR`, only the newest `PROFILE_MAX_FILES`
+    reports are kept. Its name is returned in the `X-Profile-Id` response header.
+    Requests without the header are passed through untouched.
+
+    Only one request is profiled at a time. The profiler sees the event loop thread, so work of other requests
+    running concurrently on the loop shows up as well, while sync dependencies running in the threadpool do not.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _is_triggered(scope) or not _profiler_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}.txt"
+        status = None
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", name.encode("latin-1"))]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                profiler.disable()
+            wall_time = time.perf_counter() - start
+            try:
+                await run_in_threadpool(_write_profile, name, scope, status, wall_time, profiler)
+            except Exception:
+                logger.exception("Could not write the profile of %s %s.", scope["method"], scope["path"])
+        finally:
+            _profiler_lock.release()
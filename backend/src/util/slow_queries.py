@@ -0,0 +1,126 @@
+"""Slow-query log, aggregated by statement shape"""
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config.config import SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_MAX_SHAPES, SLOW_QUERY_EXPLAIN_TOP
+from .deadline import strip_statement_timeout
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+_lock = threading.Lock()
+_shapes = {}
+_dropped = 0
+_engine: Engine | None = None
+
+
+def normalize_statement(statement: str) -> str:
+    """ Reduce a statement to its shape, so executions with different values are aggregated together.
+
+    :param statement: SQL as sent to the database
+    :return: Statement with collapsed whitespace, literals and parameters replaced by `?` and `IN`-lists collapsed
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+def _record(statement: str, parameters, executemany: bool, duration: float):
+    global _dropped
+    statement = strip_statement_timeout(statement)
+    shape = normalize_statement(statement)
+
+    with _lock:
+        entry = _shapes.get(shape)
+        if entry is None:
+            if len(_shapes) >= SLOW_QUERY_MAX_SHAPES:
+                _dropped += 1
+                return
+            entry = _shapes[shape] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "sample": None}
+
+        entry["count"] += 1
+        entry["total_ms"] += duration
+        if duration >= entry["max_ms"]:
+            entry["max_ms"] = duration
+            if not executemany:
+                # Kept in memory only, to be able to run EXPLAIN later on. Never part of the report.
+                entry["sample"] = (statement, parameters)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so statements failing before or during execution leave nothing behind
+    context.slow_query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = (time.perf_counter() - context.slow_query_start_time) * 1000
+    if duration >= SLOW_QUERY_THRESHOLD_MS and not statement.lstrip().upper().startswith("EXPLAIN"):
+        _record(statement, parameters, executemany, duration)
+
+
+def install_slow_query_log(engine: Engine):
+    """ Time every statement executed over `engine` and record the ones slower than `SLOW_QUERY_THRESHOLD_MS`.
+
+    :param engine: Engine to instrument
+    """
+    global _engine
+    _engine = engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _explain(statement: str, parameters):
+    try:
+        with _engine.connect() as connection:
+            result = connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+            return [dict(row._mapping) for row in result]
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+
+
+def get_slow_query_report(explain: bool = False):
+    """ Aggregated slow-query log.
+
+    :param explain: If `True`, `EXPLAIN` is run for the `SLOW_QUERY_EXPLAIN_TOP` SELECT-shapes with the highest max time
+    :return: Dict with the threshold, the number of dropped shapes and the shapes sorted by total time
+    """
+    with _lock:
+        shapes = [(shape, dict(entry)) for shape, entry in _shapes.items()]
+        dropped = _dropped
+
+    explained = set()
+    if explain and _engine is not None:
+        selects = [item for item in shapes if item[1]["sample"] and item[0].upper().startswith("SELECT")]
+        selects.sort(key=lambda item: item[1]["max_ms"], reverse=True)
+        explained = {shape for shape, _ in selects[:SLOW_QUERY_EXPLAIN_TOP]}
+
+    report = []
+    for shape, entry in sorted(shapes, key=lambda item: item[1]["total_ms"], reverse=True):
+        line = {
+            "statement": shape,
+            "count": entry["count"],
+            "total_ms": round(entry["total_ms"], 3),
+            "max_ms": round(entry["max_ms"], 3),
+            "avg_ms": round(entry["total_ms"] / entry["count"], 3),
+        }
+        if shape in explained:
+            line["explain"] = _explain(*entry["sample"])
+        report.append(line)
+
+    return {"threshold_ms": SLOW_QUERY_THRESHOLD_MS, "dropped_shapes": dropped, "queries": report}
+
+
+def reset_slow_query_log():
+    global _dropped
+    with _lock:
+        _shapes.clear()
+        _dropped = 0
@@ -55,3 +55,19 @@ def user_1(db):
     db.commit()
 
     return u
+
+
+@pytest.fixture
+def regular_user(db):
+    u = User(
+        first_name="Kim",
+        last_name="Wexler",
+        email="kim.wexler@wexler-mcgill.law",
+        password=get_password_hash("asdf"),
+        super_admin=False,
+        disabled=False
+    )
+    db.add(u)
+    db.commit()
+
+    return u
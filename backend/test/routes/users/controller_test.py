@@ -0,0 +1,75 @@
+import pytest
+from fastapi import HTTPException
+
+from src.routes.auth.models import PasswordResetToken
+from src.routes.users.controller import get_users_by_ids, set_users_disabled, promote_users, delete_users, \
+    get_user_by_mail, check_user_existence_by_id, check_user_existence_by_email
+from src.routes.users.models import User
+
+
+def test_get_user_by_mail(db, user_1):
+    assert get_user_by_mail(mail="saul.goodman@wexler-mcgill.law", db=db).id == user_1.id
+
+    with pytest.raises(HTTPException) as exception:
+        get_user_by_mail(mail="tuco@salamanca.biz", db=db)
+    assert exception.value.status_code == 404
+    assert exception.value.detail == 'There is no user with the E-Mail "tuco@salamanca.biz".'
+
+
+def test_check_user_existence(db, user_1):
+    assert check_user_existence_by_id(user_id=user_1.id, db=db) is True
+    assert check_user_existence_by_id(user_id=0, db=db) is False
+    assert check_user_existence_by_email(mail="saul.goodman@wexler-mcgill.law", db=db) is True
+    assert check_user_existence_by_email(mail="tuco@salamanca.biz", db=db) is False
+
+
+def test_get_users_by_ids(db, user_1):
+    disabled_user = User(
+        first_name="Lalo",
+        last_name="Salamanca",
+        email="lalo@salamanca.biz",
+        password="",
+        super_admin=False,
+        disabled=True
+    )
+    db.add(disabled_user)
+    db.commit()
+
+    # Order of the request is preserved, unknown ids are reported as missing
+    result = get_users_by_ids(user_ids=[disabled_user.id, 0, user_1.id], admin=True, db=db)
+    assert [user.id for user in result["users"]] == [disabled_user.id, user_1.id]
+    assert result["missing"] == [0]
+
+    # Disabled users are hidden for non-admins
+    result = get_users_by_ids(user_ids=[disabled_user.id, user_1.id], admin=False, db=db)
+    assert result["users"] == [{"first_name": "Saul", "last_name": "Goodman",
+                                "email": "saul.goodman@wexler-mcgill.law", "disabled": False}]
+    assert result["missing"] == [disabled_user.id]
+
+
+def test_set_users_disabled(db, user_1):
+    result = set_users_disabled(user_ids=[user_1.id, 0], disabled=True, db=db)
+    assert result == {"affected": [user_1.id], "missing": [0]}
+    db.refresh(user_1)
+    assert user_1.disabled == True
+
+
+def test_promote_users(db, regular_user):
+    result = promote_users(user_ids=[regular_user.id, 0], db=db)
+    assert result == {"affected": [regular_user.id], "missing": [0]}
+    db.refresh(regular_user)
+    assert regular_user.super_admin == True
+
+
+def test_delete_users(db, user_1, regular_user):
+    deleted_id, kept_id = regular_user.id, user_1.id
+    db.add(PasswordResetToken(user_id=deleted_id, reset_token="token"))
+    db.commit()
+
+    result = delete_users(user_ids=[deleted_id, 0], db=db)
+    assert result == {"affected": [deleted_id], "missing": [0]}
+    db.expire_all()
+    assert db.query(User).filter(User.id == deleted_id).count() == 0
+    assert db.query(User).filter(User.id == kept_id).count() == 1
+    # Pending reset tokens are removed by the foreign key (ON DELETE CASCADE)
+    assert db.query(PasswordResetToken).filter(PasswordResetToken.user_id == deleted_id).count() == 0
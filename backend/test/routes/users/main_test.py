@@ -0,0 +1,13 @@
+from test.test_util.token import get_bearer_token_header
+
+
+def test_bulk_operations_require_admin(db, client, user_1, regular_user):
+    headers = get_bearer_token_header(client, regular_user)
+
+    for operation in ["disable", "enable", "promote", "delete"]:
+        response = client.post(url=f"/users/bulk/{operation}", json={"ids": [user_1.id]}, headers=headers)
+        assert response.status_code == 403
+        assert response.json() == {"detail": "Admin rights required"}
+
+    db.refresh(user_1)
+    assert user_1.disabled == False
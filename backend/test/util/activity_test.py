@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+import src.util.activity as activity
+from src.util.activity import record_login, record_seen, flush_activity, flush_activity_periodically
+
+
+def test_flush_activity(db, user_1):
+    record_login(user_id=user_1.id)
+    flush_activity(db=db)
+    db.refresh(user_1)
+    last_login_at = user_1.last_login_at
+    assert last_login_at is not None
+    assert user_1.last_seen_at == last_login_at
+
+    # Later requests only move last_seen_at
+    record_seen(user_id=user_1.id)
+    flush_activity(db=db)
+    db.refresh(user_1)
+    assert user_1.last_login_at == last_login_at
+    assert user_1.last_seen_at >= last_login_at
+
+
+def _failing_session():
+    raise ConnectionError("Database down")
+
+
+def test_record_never_writes(monkeypatch):
+    monkeypatch.setattr(activity, "ACTIVITY_BUFFER_MAX_USERS", 1)
+    monkeypatch.setattr(activity, "SessionLocal", _failing_session)
+    monkeypatch.setattr(activity, "_pending", {})
+
+    # A full buffer and a broken database do not affect the request
+    record_seen(user_id=1)
+    record_seen(user_id=2)
+    assert list(activity._pending) == [1]
+
+    # A failed flush keeps the activity for the next attempt
+    with pytest.raises(ConnectionError):
+        flush_activity()
+    assert list(activity._pending) == [1]
+    record_login(user_id=1)
+    assert activity._pending[1]["b_login"] is not None
+
+
+def test_full_buffer_wakes_flusher(monkeypatch):
+    monkeypatch.setattr(activity, "ACTIVITY_BUFFER_MAX_USERS", 1)
+    monkeypatch.setattr(activity, "ACTIVITY_FLUSH_INTERVAL_SECONDS", 60)
+    monkeypatch.setattr(activity, "_pending", {})
+    flushed = []
+    monkeypatch.setattr(activity, "flush_activity", lambda: flushed.append(activity._take_pending()))
+
+    async def run():
+        flusher = asyncio.create_task(flush_activity_periodically())
+        await asyncio.sleep(0)
+        record_seen(user_id=1)
+        for _ in range(100):
+            if flushed:
+                break
+            await asyncio.sleep(0.01)
+        flusher.cancel()
+
+    asyncio.run(run())
+    assert [list(pending) for pending in flushed] == [[1]]
+
+
+def test_flush_activity_only_moves_forward(db, user_1, regular_user, monkeypatch):
+    monkeypatch.setattr(activity, "BULK_CHUNK_SIZE", 1)
+    record_login(user_id=user_1.id)
+    record_seen(user_id=regular_user.id)
+    newer = dict(activity._pending)
+    flush_activity(db=db)
+
+    # Activity flushed later by another worker, but recorded earlier
+    older = {user_id: {**entry, "b_seen": entry["b_seen"].replace(year=2000)} for user_id, entry in newer.items()}
+    older[user_1.id]["b_login"] = older[user_1.id]["b_seen"]
+    monkeypatch.setattr(activity, "_pending", older)
+    flush_activity(db=db)
+
+    db.refresh(user_1)
+    db.refresh(regular_user)
+    assert user_1.last_login_at == newer[user_1.id]["b_login"]
+    assert user_1.last_seen_at == newer[user_1.id]["b_seen"]
+    assert regular_user.last_login_at is None
+    assert regular_user.last_seen_at == newer[regular_user.id]["b_seen"]
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+
+from src.util.admission import get_route_class, AdmissionControlMiddleware
+from src.util.deadline import set_deadline, reset_deadline, with_deadline, is_statement_timeout, _limit_statement
+
+
+def test_get_route_class():
+    assert get_route_class({"path": "/auth/token", "method": "POST"}) == "auth"
+    assert get_route_class({"path": "/token", "method": "POST"}) == "auth"
+    assert get_route_class({"path": "/users/", "method": "GET"}) == "read"
+    assert get_route_class({"path": "/users/bulk/disable", "method": "POST"}) == "write"
+
+
+async def _request(app):
+    response = {}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+
+    await app({"type": "http", "method": "GET", "path": "/users/", "headers": []}, None, send)
+    return response
+
+
+def test_admission_control():
+    async def run():
+        release = asyncio.Event()
+
+        async def endpoint(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        app = AdmissionControlMiddleware(endpoint, limits={"auth": 1, "read": 1, "write": 1}, max_queue_wait=0.05)
+        first = asyncio.create_task(_request(app))
+        await asyncio.sleep(0)
+
+        # The only slot is taken, so the second request is rejected once its queue wait budget is spent
+        rejected = await _request(app)
+        assert rejected["status"] == 503
+        assert b"retry-after" in rejected["headers"]
+
+        # The slot is released after the first request and can be used again
+        release.set()
+        assert (await first)["status"] == 200
+        assert (await _request(app))["status"] == 200
+
+    asyncio.run(run())
+
+
+def test_slot_released_on_error():
+    async def run():
+        async def endpoint(scope, receive, send):
+            raise RuntimeError()
+
+        app = AdmissionControlMiddleware(endpoint, limits={"auth": 1, "read": 1, "write": 1}, max_queue_wait=0)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await _request(app)
+
+    asyncio.run(run())
+
+
+def test_with_deadline():
+    async def run():
+        token = set_deadline(time.monotonic() + 0.01)
+        try:
+            with pytest.raises(HTTPException) as exception:
+                await with_deadline(asyncio.sleep(1))
+            assert exception.value.status_code == 503
+        finally:
+            reset_deadline(token)
+
+        token = set_deadline(time.monotonic() + 5)
+        try:
+            assert await with_deadline(asyncio.sleep(0, result="sent")) == "sent"
+        finally:
+            reset_deadline(token)
+
+        # Without a deadline nothing is limited
+        assert await with_deadline(asyncio.sleep(0, result="sent")) == "sent"
+
+    asyncio.run(run())
+
+
+def test_limit_statement():
+    # Outside of a request
+    assert _limit_statement(None, None, "SELECT 1", (), None, False) == ("SELECT 1", ())
+
+    token = set_deadline(time.monotonic() + 5)
+    try:
+        statement, _ = _limit_statement(None, None, "SELECT 1", (), None, False)
+        assert statement.startswith("SET STATEMENT max_statement_time=") and statement.endswith(" FOR SELECT 1")
+        # executemany and statements other than SELECT/INSERT/UPDATE/DELETE are left alone
+        assert _limit_statement(None, None, "UPDATE users SET disabled = 1", [(), ()], None, True)[0] == \
+               "UPDATE users SET disabled = 1"
+        assert _limit_statement(None, None, "SHOW TABLES", (), None, False)[0] == "SHOW TABLES"
+    finally:
+        reset_deadline(token)
+
+    token = set_deadline(time.monotonic() - 1)
+    try:
+        with pytest.raises(HTTPException):
+            _limit_statement(None, None, "SELECT 1", (), None, False)
+    finally:
+        reset_deadline(token)
+
+
+def test_is_statement_timeout():
+    assert is_statement_timeout(OperationalError("SELECT 1", {}, Exception(1969, "Query execution was interrupted")))
+    assert not is_statement_timeout(OperationalError("SELECT 1", {}, Exception(2013, "Lost connection")))
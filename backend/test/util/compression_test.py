@@ -0,0 +1,58 @@
+import asyncio
+import gzip
+
+import src.util.compression as compression
+from src.util.compression import choose_encoding, CompressionMiddleware
+
+
+def test_choose_encoding(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding(None) is None
+
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+
+
+def _respond(body: bytes, content_type: bytes, extra_headers=()):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+                               + list(extra_headers)})
+        await send({"type": "http.response.body", "body": body})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/users/", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app)(scope, None, send))
+    return dict(messages[0]["headers"]), messages[1]["body"]
+
+
+def test_compression_middleware(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    large = b"[" + b'{"first_name":"Saul"},' * 100 + b"{}]"
+
+    headers, body = _respond(large, b"application/json", [(b"etag", b'"abc"')])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert headers[b"vary"] == b"Accept-Encoding"
+    # The compressed representation must not share the strong ETag of the uncompressed one
+    assert headers[b"etag"] == b'W/"abc"'
+    assert gzip.decompress(body) == large
+
+    # Too small
+    headers, body = _respond(b"{}", b"application/json")
+    assert b"content-encoding" not in headers and body == b"{}"
+
+    # Content type not allowed
+    headers, body = _respond(large, b"image/png")
+    assert b"content-encoding" not in headers and body == large
+
+    # Already encoded
+    headers, body = _respond(large, b"application/json", [(b"content-encoding", b"br")])
+    assert headers[b"content-encoding"] == b"br" and body == large
@@ -0,0 +1,38 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.util.openapi_cache import get_cached_openapi_response
+
+
+def _client(**kwargs):
+    app = FastAPI(openapi_url=None)
+
+    @app.get("/openapi.json")
+    def get_openapi_document(request: Request):
+        return get_cached_openapi_response(app, request)
+
+    return TestClient(app, **kwargs)
+
+
+def test_etag_per_variant():
+    client = _client()
+    identity = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == identity.json()
+    assert identity.headers["etag"] != compressed.headers["etag"]
+
+    # Revalidation only succeeds for the ETag of the selected variant, entries of the list are parsed
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity",
+                                                    "If-None-Match": f'"other", W/{identity.headers["etag"]}'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == identity.headers["etag"]
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity",
+                                                    "If-None-Match": compressed.headers["etag"]})
+    assert response.status_code == 200
+
+
+def test_root_path_in_servers():
+    assert _client(root_path="/api").get("/openapi.json").json()["servers"] == [{"url": "/api"}]
+    assert "servers" not in _client().get("/openapi.json").json()
@@ -0,0 +1,33 @@
+import cProfile
+
+import src.util.profiling as profiling
+
+
+def _write(name):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    sum(range(100))
+    profiler.disable()
+    profiling._write_profile(name, {"method": "GET", "path": "/users/"}, 200, 0.001, profiler)
+
+
+def test_profile_ring(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_MAX_FILES", 2)
+
+    names = [f"{1000 + i}-0000000{i}.txt" for i in range(3)]
+    for name in names:
+        _write(name)
+
+    # Only the newest profiles are kept, newest first
+    assert profiling.list_profiles() == [names[2], names[1]]
+    assert "GET /users/ -> 200" in open(profiling.get_profile_path(names[2])).read()
+
+
+def test_get_profile_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    (tmp_path / "notes.txt").write_text("")
+
+    assert profiling.get_profile_path("1000-00000000.txt") is None
+    assert profiling.get_profile_path("notes.txt") is None
+    assert profiling.get_profile_path("../1000-00000000.txt") is None
@@ -0,0 +1,38 @@
+import src.util.slow_queries as slow_queries
+from src.util.slow_queries import normalize_statement, get_slow_query_report, reset_slow_query_log
+
+
+def test_normalize_statement():
+    # Literals and placeholders of every paramstyle become ?
+    assert normalize_statement("SELECT * FROM users WHERE email = 'it''s' AND id = 12") == \
+           "SELECT * FROM users WHERE email = ? AND id = ?"
+    assert normalize_statement("SELECT * FROM users WHERE users.email = %(email_1)s AND users_1.id = %s") == \
+           "SELECT * FROM users WHERE users.email = ? AND users_1.id = ?"
+
+    # Whitespace and IN-lists of any length are collapsed
+    assert normalize_statement("SELECT *\n  FROM users WHERE id IN (%s, %s,%s)") == \
+           normalize_statement("SELECT * FROM users WHERE id IN (?)") == \
+           "SELECT * FROM users WHERE id IN (?)"
+
+
+def test_record(monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MAX_SHAPES", 1)
+    reset_slow_query_log()
+
+    slow_queries._record("SELECT * FROM users WHERE id = %s", (1,), False, 120.0)
+    slow_queries._record("SELECT * FROM users WHERE id = %s", (2,), False, 300.0)
+    # A second shape exceeds the cap and is only counted
+    slow_queries._record("SELECT * FROM password_reset_tokens", (), False, 500.0)
+
+    report = get_slow_query_report()
+    assert report["dropped_shapes"] == 1
+    assert report["queries"] == [{
+        "statement": "SELECT * FROM users WHERE id = ?",
+        "count": 2,
+        "total_ms": 420.0,
+        "max_ms": 300.0,
+        "avg_ms": 210.0,
+    }]
+
+    reset_slow_query_log()
+    assert get_slow_query_report()["queries"] == []